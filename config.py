@@ -1,4 +1,6 @@
 # config.py
+import os
+
 CANDIDATE_LABELS_WITH_DESCRIPTIONS = {
     "Romance": "Stories focusing on love, relationships, and emotional connection.",
     "Science Fiction": "Speculative narratives exploring futuristic technology, space travel, or alternate realities.",
@@ -21,3 +23,40 @@ CANDIDATE_LABELS_WITH_DESCRIPTIONS = {
     "Educational": "Informative texts intended to instruct or provide in-depth knowledge on a subject.",
     "Other": "For books that do not fit any of the above categories, including language textbooks, reference materials, or books with insufficient metadata."
 }
+
+# Two-tier classification cascade. Cheap tier-1 sources decide a book on their own
+# when their confidence reaches the threshold; everything else goes to bart-large-mnli.
+CASCADE_CSV_GENRE_COLUMNS = ["predicted_genre", "genre", "#genre", "tags", "bookshelves", "shelves"]
+CASCADE_KEYWORD_THRESHOLD = 0.8
+CASCADE_KEYWORD_MIN_HITS = 2
+CASCADE_LINEAR_THRESHOLD = 0.9
+CASCADE_LINEAR_MIN_SAMPLES = 50
+MANIFEST_FILENAME = "organizer_manifest.csv"
+
+# Watch-folder daemon (python main.py watch ...).
+WATCH_SETTLE_SECONDS = 2.0
+WATCH_POLL_INTERVAL = 1.0
+WATCH_BATCH_SIZE = 16
+WATCH_BATCH_WAIT = 1.0
+WATCH_STATUS_PORT = 8765
+
+# Adaptive inference batching. Prompts are sorted by token length; the batch size grows
+# while batches stay under the latency target and token budget, and halves on OOM.
+INFERENCE_INITIAL_BATCH_SIZE = 8
+INFERENCE_MAX_BATCH_SIZE = 64
+INFERENCE_LATENCY_TARGET = 4.0
+INFERENCE_MAX_BATCH_TOKENS = 32768
+INFERENCE_MEMORY_FRACTION = 0.85
+CLASSIFY_CHUNK_SIZE = 128
+
+# Shared inference server (python main.py serve). Organizer processes use it when it is
+# running and load their own models otherwise.
+# The path is fixed (not derived from TMPDIR) so every user and service finds the same socket;
+# services with PrivateTmp need a directory outside /tmp. Clients need write access to the
+# socket, so it is made group-accessible: put all operators in INFERENCE_SOCKET_GROUP.
+INFERENCE_SOCKET_DIR = "/tmp/ebook-organizer"
+INFERENCE_SOCKET_PATH = os.path.join(INFERENCE_SOCKET_DIR, "inference.sock")
+INFERENCE_SOCKET_GROUP = None
+INFERENCE_SOCKET_MODE = 0o660
+INFERENCE_SERVER_BATCH_WAIT = 0.05
+INFERENCE_SERVER_MAX_BATCH_TEXTS = 256
@@ -1,11 +1,145 @@
 # main.py
-from ui import OrganizerApp
-import tkinter as tk
+import os
+import argparse
+import logging
+
+from config import CANDIDATE_LABELS_WITH_DESCRIPTIONS, WATCH_STATUS_PORT, INFERENCE_SOCKET_PATH, INFERENCE_SOCKET_GROUP
+
+COMMON_EXTENSIONS = [".epub", ".pdf", ".mobi"]
+
+
+def run_gui():
+    import tkinter as tk
+    from ui import OrganizerApp
 
-def main():
     root = tk.Tk()
     app = OrganizerApp(root)
     root.mainloop()
 
+
+def build_organizer(args, classifier_engine=None, shard_plan=None):
+    from models.organizer import EbookOrganizer
+
+    return EbookOrganizer(
+        metadata_csv=args.metadata_csv,
+        source_folder=args.source_folder,
+        target_base_folder=args.target_folder,
+        duplicates_folder=args.duplicates_folder,
+        common_extensions=COMMON_EXTENSIONS,
+        candidate_labels=list(CANDIDATE_LABELS_WITH_DESCRIPTIONS.keys()),
+        classifier_engine=classifier_engine,
+        use_file_only=args.file_only,
+        organize_by_author=args.by_author,
+        shard_plan=shard_plan
+    )
+
+
+def run_shard(args):
+    """
+    Extract and classify one shard of the source folder, writing a move plan to --plan-dir.
+    """
+    from models.classifier import ClassifierEngine
+    from models.sharding import ShardPlan, LeaseTable
+
+    lease_table = LeaseTable(args.lease_db) if args.lease_db else None
+    shard_plan = ShardPlan(args.plan_dir, args.source_folder, worker_id=args.worker_id,
+                           shard_index=args.shard_index, shard_count=args.shard_count,
+                           lease_table=lease_table)
+    labels = list(CANDIDATE_LABELS_WITH_DESCRIPTIONS.keys())
+    organizer = build_organizer(args, ClassifierEngine(labels, device=args.device), shard_plan)
+    print(organizer.organize())
+
+
+def run_merge(args):
+    """
+    Apply all worker move plans in --plan-dir and print the combined report.
+    """
+    from models.sharding import merge_plans
+
+    print(merge_plans(args.plan_dir, build_organizer(args)))
+
+
+def run_watch(args):
+    """
+    Organize the source folder once, then keep the classifier loaded and place new
+    books as they arrive.
+    """
+    from models.classifier import ClassifierEngine
+    from models.watcher import FolderWatcher, OrganizerDaemon
+
+    labels = list(CANDIDATE_LABELS_WITH_DESCRIPTIONS.keys())
+    organizer = build_organizer(args, ClassifierEngine(labels, device=args.device))
+    watcher = FolderWatcher(args.source_folder, COMMON_EXTENSIONS, use_inotify=not args.poll,
+                            exclude_folders=[args.target_folder, args.duplicates_folder])
+    if not args.skip_initial:
+        logging.info(organizer.organize())
+    status_address = ("127.0.0.1", args.status_port) if args.status_port else None
+    OrganizerDaemon(organizer, watcher, status_address=status_address).run()
+
+
+def run_serve(args):
+    """
+    Hold one copy of the models and serve every organizer process on this machine.
+    """
+    from models.server import InferenceServer
+
+    InferenceServer(args.socket, device=args.device, socket_group=args.group).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ebook Organizer")
+    subparsers = parser.add_subparsers(dest="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--metadata-csv", required=True)
+    common.add_argument("--source-folder", required=True)
+    common.add_argument("--target-folder", required=True)
+    common.add_argument("--duplicates-folder", required=True)
+    common.add_argument("--plan-dir", help="Shared folder for worker move plans (default: <target>/.plans)")
+    common.add_argument("--file-only", action="store_true", help="Use file metadata only (ignore CSV metadata)")
+    common.add_argument("--by-author", action="store_true", help="Organize by author instead of genre")
+
+    shard = subparsers.add_parser("shard", parents=[common], help="Run one worker of a sharded organize run")
+    shard.add_argument("--shard-index", type=int, help="This worker's shard (0-based)")
+    shard.add_argument("--shard-count", type=int, help="Total number of shards")
+    shard.add_argument("--lease-db", help="SQLite lease table on the share; workers claim files dynamically")
+    shard.add_argument("--worker-id", help="Worker name used for the plan file (default: host-pid)")
+    shard.add_argument("--device", type=int, default=0)
+    shard.set_defaults(func=run_shard)
+
+    merge = subparsers.add_parser("merge", parents=[common], help="Apply the move plans of all workers")
+    merge.set_defaults(func=run_merge)
+
+    watch = subparsers.add_parser("watch", parents=[common], help="Keep running and organize new books on arrival")
+    watch.add_argument("--device", type=int, default=0)
+    watch.add_argument("--poll", action="store_true", help="Poll the source folder instead of using inotify")
+    watch.add_argument("--skip-initial", action="store_true", help="Do not organize existing files at startup")
+    watch.add_argument("--status-port", type=int, default=WATCH_STATUS_PORT,
+                       help="Local HTTP port for queue depth/throughput (0 disables)")
+    watch.set_defaults(func=run_watch)
+
+    serve = subparsers.add_parser("serve", help="Run the shared inference server for local organizer processes")
+    serve.add_argument("--socket", default=INFERENCE_SOCKET_PATH, help="Unix socket path")
+    serve.add_argument("--group", default=INFERENCE_SOCKET_GROUP,
+                       help="Group given access to the socket (all operators should be members)")
+    serve.add_argument("--device", type=int, default=0)
+    serve.set_defaults(func=run_serve)
+
+    args = parser.parse_args()
+    if args.command is None:
+        run_gui()
+        return
+
+    logging.basicConfig(level=logging.INFO)
+    if getattr(args, "target_folder", None) and args.plan_dir is None:
+        args.plan_dir = os.path.join(args.target_folder, ".plans")
+    if args.command == "shard":
+        if args.shard_count is None and args.lease_db is None:
+            parser.error("shard needs --shard-index/--shard-count, --lease-db, or both")
+        if args.shard_count is not None and not (args.shard_index is not None and 0 <= args.shard_index < args.shard_count):
+            parser.error("--shard-index must be between 0 and --shard-count - 1")
+    args.func(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+# models/batching.py
+import time
+import logging
+
+from config import (
+    INFERENCE_INITIAL_BATCH_SIZE,
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_LATENCY_TARGET,
+    INFERENCE_MAX_BATCH_TOKENS,
+    INFERENCE_MEMORY_FRACTION,
+)
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Tokens the zero-shot pipeline adds per pair for the "This example is {label}." hypothesis.
+HYPOTHESIS_TOKENS = 12
+
+
+def is_out_of_memory(error):
+    return "out of memory" in str(error).lower()
+
+
+class AdaptiveBatcher:
+    """
+    Runs inference over prompts in length-sorted batches. The batch size grows while a
+    batch finishes well inside the latency target and GPU memory stays below the memory
+    fraction, is capped by a padded-token budget, and halves on out-of-memory errors
+    (the size that failed becomes the new ceiling). The learned size is kept between
+    calls. Results come back in input order.
+    """
+    def __init__(self, tokenizer=None, initial_batch_size=INFERENCE_INITIAL_BATCH_SIZE,
+                 max_batch_size=INFERENCE_MAX_BATCH_SIZE, latency_target=INFERENCE_LATENCY_TARGET,
+                 max_batch_tokens=INFERENCE_MAX_BATCH_TOKENS, memory_fraction=INFERENCE_MEMORY_FRACTION):
+        self.tokenizer = tokenizer
+        self.batch_size = initial_batch_size
+        self.largest_ok_size = 0
+        self.max_batch_size = max_batch_size
+        self.latency_target = latency_target
+        self.max_batch_tokens = max_batch_tokens
+        self.memory_fraction = memory_fraction
+
+    def token_lengths(self, texts):
+        if self.tokenizer is None:
+            # Rough estimate: about four characters per token.
+            return [len(text) // 4 + 1 for text in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=True, truncation=True)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def memory_high(self):
+        if torch is None or not torch.cuda.is_available():
+            return False
+        device = torch.cuda.current_device()
+        total = torch.cuda.get_device_properties(device).total_memory
+        return torch.cuda.max_memory_allocated(device) > self.memory_fraction * total
+
+    def run(self, texts, infer):
+        """
+        Calls infer(batch_texts) on length-sorted batches and returns the results in the
+        order of texts. infer must return one result per input text.
+        """
+        lengths = [length + HYPOTHESIS_TOKENS for length in self.token_lengths(texts)]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        results = [None] * len(texts)
+        position = 0
+        while position < len(order):
+            size = min(self.batch_size, len(order) - position)
+            # Sorted ascending, so the last prompt in the batch sets the padded length.
+            while size > 1 and size * lengths[order[position + size - 1]] > self.max_batch_tokens:
+                size //= 2
+            batch = order[position:position + size]
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.reset_peak_memory_stats()
+            started = time.perf_counter()
+            try:
+                outputs = infer([texts[i] for i in batch])
+            except RuntimeError as e:
+                if not is_out_of_memory(e) or size == 1:
+                    raise
+                # Never grow back to a size that has run out of memory; fall back to the
+                # largest size that has worked if that beats halving.
+                self.max_batch_size = min(self.max_batch_size, size - 1)
+                self.batch_size = max(1, size // 2, min(self.largest_ok_size, self.max_batch_size))
+                logging.warning(f"Out of memory at batch size {size}; retrying with {self.batch_size}.")
+                if torch is not None and torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                continue
+            elapsed = time.perf_counter() - started
+
+            for index, output in zip(batch, outputs):
+                results[index] = output
+            position += size
+            self.largest_ok_size = max(self.largest_ok_size, size)
+
+            if elapsed > self.latency_target:
+                self.batch_size = max(1, size // 2)
+            elif (size == self.batch_size and elapsed < self.latency_target / 2
+                  and self.batch_size < self.max_batch_size and not self.memory_high()):
+                self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+        return results
@@ -0,0 +1,193 @@
+# models/cascade.py
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+
+from config import (
+    CASCADE_CSV_GENRE_COLUMNS,
+    CASCADE_KEYWORD_THRESHOLD,
+    CASCADE_KEYWORD_MIN_HITS,
+    CASCADE_LINEAR_THRESHOLD,
+    CASCADE_LINEAR_MIN_SAMPLES,
+)
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "from", "into", "any", "are", "not", "its", "their",
+    "often", "such", "other", "those", "these", "above", "below", "based", "about", "including",
+    "stories", "story", "tales", "narratives", "books", "book", "accounts", "texts", "guides",
+}
+
+# Description words too common in ordinary titles to say anything about the genre.
+GENERIC_WORDS = {
+    "life", "well", "being", "age", "set", "state", "light", "system", "real", "help", "self",
+}
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z]+", str(text).lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+class KeywordLexicon:
+    """
+    Keyword lexicon built from the candidate labels and their descriptions.
+    Label names weigh more than description words; words shared by many labels and
+    generic title words are dropped.
+    """
+    def __init__(self, labels_with_descriptions, max_label_share=2):
+        word_labels = defaultdict(set)
+        for label, description in labels_with_descriptions.items():
+            for word in tokenize(label + " " + description):
+                word_labels[word].add(label)
+
+        self.weights = defaultdict(dict)
+        self.phrases = {}
+        for label, description in labels_with_descriptions.items():
+            for word in tokenize(description):
+                if len(word_labels[word]) <= max_label_share and word not in GENERIC_WORDS:
+                    self.weights[word][label] = 1
+            for word in tokenize(label):
+                if len(word_labels[word]) <= max_label_share and word not in GENERIC_WORDS:
+                    self.weights[word][label] = 2
+            if " " in label or "-" in label:
+                self.phrases[label] = re.compile(r"\b" + re.escape(label.lower()) + r"\b")
+
+    def score(self, text):
+        """
+        Returns (label, confidence, distinct_hits, phrase_hit) for the best-scoring label.
+        Each word or phrase counts once, however often it repeats.
+        """
+        totals = Counter()
+        terms = defaultdict(set)
+        phrase_labels = set()
+        lowered = str(text).lower()
+        for label, pattern in self.phrases.items():
+            if pattern.search(lowered):
+                totals[label] += 3
+                terms[label].add(label.lower())
+                phrase_labels.add(label)
+        for word in set(tokenize(lowered)):
+            for label, weight in self.weights.get(word, {}).items():
+                totals[label] += weight
+                terms[label].add(word)
+        if not totals:
+            return None, 0.0, 0, False
+        label, points = totals.most_common(1)[0]
+        return label, points / sum(totals.values()), len(terms[label]), label in phrase_labels
+
+
+class TokenLinearModel:
+    """
+    Multinomial naive Bayes over title/author tokens (a linear model in log space),
+    trained on earlier decisions recorded in the manifest.
+    """
+    def __init__(self):
+        self.class_log_prior = {}
+        self.token_counts = defaultdict(Counter)
+        self.total_tokens = {}
+        self.vocabulary = set()
+
+    def fit(self, texts, labels):
+        class_counts = Counter(labels)
+        for text, label in zip(texts, labels):
+            tokens = tokenize(text)
+            self.token_counts[label].update(tokens)
+            self.vocabulary.update(tokens)
+        total = sum(class_counts.values())
+        for label, count in class_counts.items():
+            self.class_log_prior[label] = math.log(count / total)
+            self.total_tokens[label] = sum(self.token_counts[label].values())
+        return self
+
+    def token_log_prob(self, label, token):
+        # Laplace-smoothed on demand; storing it for every label x vocabulary pair costs far more memory.
+        vocab_size = len(self.vocabulary) + 1
+        return math.log((self.token_counts[label][token] + 1) / (self.total_tokens[label] + vocab_size))
+
+    def predict(self, text):
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        if not tokens or len(self.class_log_prior) < 2:
+            return None, 0.0
+        log_scores = {
+            label: prior + sum(self.token_log_prob(label, t) for t in tokens)
+            for label, prior in self.class_log_prior.items()
+        }
+        best = max(log_scores.values())
+        norm = sum(math.exp(s - best) for s in log_scores.values())
+        label = max(log_scores, key=log_scores.get)
+        return label, 1.0 / norm
+
+
+class ClassificationCascade:
+    """
+    Tier 1 (cheap): CSV genre/shelf columns, keyword lexicon, linear model on past decisions.
+    Tier 2: the zero-shot classifier, used only when no tier-1 source is confident.
+    """
+    TIERS = ["csv", "keyword", "linear", "classifier"]
+
+    def __init__(self, candidate_labels, labels_with_descriptions, manifest=None):
+        self.candidate_labels = list(candidate_labels)
+        self.label_lookup = {label.lower(): label for label in self.candidate_labels}
+        self.lexicon = KeywordLexicon(
+            {label: desc for label, desc in labels_with_descriptions.items() if label in self.label_lookup.values()}
+        )
+        self.linear_model = self.train_linear_model(manifest) if manifest else None
+        self.tier_counts = Counter()
+
+    def train_linear_model(self, manifest):
+        # Skip the model's own past decisions so it does not learn from itself.
+        records = [r for r in manifest.load()
+                   if r.get("tier") != "linear" and r.get("category") in self.label_lookup.values()]
+        if len(records) < CASCADE_LINEAR_MIN_SAMPLES:
+            logging.info(f"Linear tier disabled: {len(records)} manifest decisions "
+                         f"(need {CASCADE_LINEAR_MIN_SAMPLES}).")
+            return None
+        return TokenLinearModel().fit([r["file_key"] for r in records], [r["category"] for r in records])
+
+    def from_csv_row(self, csv_row):
+        if csv_row is None:
+            return None
+        for column in CASCADE_CSV_GENRE_COLUMNS:
+            if column not in csv_row or not isinstance(csv_row[column], str):
+                continue
+            matches = {self.label_lookup[part.strip().lower()]
+                       for part in re.split(r"[,;|/]", csv_row[column])
+                       if part.strip().lower() in self.label_lookup}
+            # Several different genres in one column is ambiguous; leave it to the next source.
+            if len(matches) == 1:
+                return matches.pop()
+        return None
+
+    def decide(self, book_text, file_key, csv_row=None):
+        """
+        Returns (label, score, tier) when a tier-1 source is confident, otherwise (None, 0.0, None).
+        book_text is the matched CSV title/authors, or the file key when no row matched;
+        the linear model sees file_key, the same text it was trained on.
+        """
+        label = self.from_csv_row(csv_row)
+        if label:
+            return label, 1.0, "csv"
+
+        label, confidence, hits, phrase_hit = self.lexicon.score(book_text)
+        if (label and (hits >= CASCADE_KEYWORD_MIN_HITS or phrase_hit)
+                and confidence >= CASCADE_KEYWORD_THRESHOLD):
+            return label, confidence, "keyword"
+
+        if self.linear_model is not None:
+            label, probability = self.linear_model.predict(file_key)
+            if label and probability >= CASCADE_LINEAR_THRESHOLD:
+                return label, probability, "linear"
+
+        return None, 0.0, None
+
+    def record_tier(self, tier):
+        # Placements that are not genre decisions (e.g. organize-by-author) are not counted.
+        if tier in self.TIERS:
+            self.tier_counts[tier] += 1
+
+    def summary(self):
+        total = sum(self.tier_counts.values())
+        if not total:
+            return "No books classified."
+        shares = ", ".join(f"{tier} {100.0 * self.tier_counts[tier] / total:.1f}%" for tier in self.TIERS)
+        return f"Classified {total} books by tier: {shares}"
@@ -2,13 +2,27 @@
 import logging
 from transformers import pipeline
 
+from .batching import AdaptiveBatcher
+from .server import InferenceClient, RemotePipeline
+from config import INFERENCE_SOCKET_PATH
+
 class ClassifierEngine:
-    def __init__(self, candidate_labels, device=0):
+    def __init__(self, candidate_labels, device=0, server_socket=INFERENCE_SOCKET_PATH):
         self.candidate_labels = candidate_labels
-        self.classifier = pipeline(
+        self.device = device
+        client = InferenceClient.connect(server_socket) if server_socket else None
+        if client is not None:
+            logging.info(f"Using inference server at '{server_socket}'.")
+            self.classifier = RemotePipeline(client, "classify", self.load_pipeline)
+        else:
+            self.classifier = self.load_pipeline()
+        self.batcher = AdaptiveBatcher()
+
+    def load_pipeline(self):
+        return pipeline(
             "zero-shot-classification",
             model="facebook/bart-large-mnli",
-            device=device
+            device=self.device
         )
 
     def classify_text(self, text):
@@ -19,9 +33,25 @@ class ClassifierEngine:
             logging.error(f"Error classifying text '{text}': {e}")
             return "Unknown", 0.0, None
 
-    def classify_texts(self, texts, batch_size=16):
+    def classify_texts(self, texts, batch_size=None, candidate_labels=None):
+        """
+        Classifies texts and returns one result per text, in input order. Without an explicit
+        batch_size the adaptive batcher (or the inference server) picks the batch sizes.
+        """
+        labels = candidate_labels or self.candidate_labels
         try:
-            return self.classifier(texts, candidate_labels=self.candidate_labels, batch_size=batch_size)
+            if batch_size:
+                return self.classifier(list(texts), candidate_labels=labels, batch_size=batch_size)
+            if getattr(self.classifier, "is_remote", False):
+                # The server batches across all clients; send the whole list at once.
+                return self.classifier(list(texts), candidate_labels=labels)
+            # Read on each call: a RemotePipeline only has a tokenizer after falling back to a local model.
+            self.batcher.tokenizer = getattr(self.classifier, "tokenizer", None)
+            return self.batcher.run(list(texts), lambda batch: self.infer(batch, labels))
         except Exception as e:
             logging.error(f"Error classifying texts: {e}")
             return []
+
+    def infer(self, texts, labels):
+        results = self.classifier(texts, candidate_labels=labels, batch_size=len(texts))
+        return [results] if isinstance(results, dict) else results
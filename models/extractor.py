@@ -8,19 +8,30 @@ from ebooklib import epub
 from transformers import pipeline
 from PyPDF2 import PdfReader
 
+from .server import InferenceClient, RemotePipeline
+from config import INFERENCE_SOCKET_PATH
+
 class EbookMetadataExtractor:
-    def __init__(self, enable_title_cleaning=False, enable_author_extraction=False):
+    def __init__(self, enable_title_cleaning=False, enable_author_extraction=False,
+                 server_socket=INFERENCE_SOCKET_PATH):
         self.enable_title_cleaning = enable_title_cleaning
         self.enable_author_extraction = enable_author_extraction
         if self.enable_author_extraction:
-            try:
-                self.instruction_model = pipeline("text2text-generation", model="google/flan-t5-base")
-            except Exception as e:
-                logging.error(f"Error initializing instruction model: {e}")
-                self.instruction_model = None
+            client = InferenceClient.connect(server_socket) if server_socket else None
+            if client is not None:
+                self.instruction_model = RemotePipeline(client, "generate", self.load_instruction_model)
+            else:
+                self.instruction_model = self.load_instruction_model()
         else:
             self.instruction_model = None
 
+    def load_instruction_model(self):
+        try:
+            return pipeline("text2text-generation", model="google/flan-t5-base")
+        except Exception as e:
+            logging.error(f"Error initializing instruction model: {e}")
+            return None
+
     def sanitize_text(self, text):
         if text is None:
             return ""
@@ -0,0 +1,42 @@
+# models/manifest.py
+import os
+import csv
+import logging
+
+
+class DecisionManifest:
+    """
+    Append-only CSV log of placement decisions (one row per book).
+    Used to report run statistics and to train the cascade's linear tier.
+    """
+    FIELDS = ["file_path", "file_key", "category", "tier", "score"]
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+
+    def record(self, file_path, file_key, category, tier, score):
+        write_header = not os.path.exists(self.manifest_path)
+        try:
+            with open(self.manifest_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerow({
+                    "file_path": file_path,
+                    "file_key": file_key,
+                    "category": category,
+                    "tier": tier,
+                    "score": f"{score:.4f}",
+                })
+        except Exception as e:
+            logging.error(f"Error writing manifest entry for '{file_path}': {e}")
+
+    def load(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        try:
+            with open(self.manifest_path, newline="", encoding="utf-8") as f:
+                return list(csv.DictReader(f))
+        except Exception as e:
+            logging.error(f"Error reading manifest '{self.manifest_path}': {e}")
+            return []
@@ -7,6 +7,7 @@ class FileMatcher:
     def __init__(self, source_folder, common_extensions):
         self.source_folder = source_folder
         self.common_extensions = common_extensions
+        self._key_index = None
         self.candidate_files = self.build_candidate_files()
 
     def build_candidate_files(self):
@@ -18,12 +19,40 @@ class FileMatcher:
                     candidate_files.append(os.path.join(root, f))
         return candidate_files
 
+    def exact_key_index(self, csv_df):
+        """
+        Maps each normalized match key to its first row index. Rebuilt only when a
+        different dataframe is passed in.
+        """
+        if self._key_index is None or self._key_index[0] is not csv_df:
+            index = {}
+            for row_index, csv_key in csv_df["match_key"].items():
+                if csv_key:
+                    index.setdefault(csv_key, row_index)
+            self._key_index = (csv_df, index)
+        return self._key_index[1]
+
     def find_best_csv_match(self, file_key, csv_df, threshold=0.6):
+        # An empty key carries no information and would "match" any row with an empty key.
+        if not file_key:
+            return None, 0.0
+        # Keys are normalized on both sides, so identical books match without fuzzy scoring.
+        exact_index = self.exact_key_index(csv_df).get(file_key)
+        if exact_index is not None:
+            return exact_index, 1.0
+
         best_index = None
         best_ratio = 0.0
-        for index, row in csv_df.iterrows():
-            csv_key = row["match_key"]
-            ratio = difflib.SequenceMatcher(None, file_key, csv_key).ratio()
+        sequence_matcher = difflib.SequenceMatcher(None)
+        sequence_matcher.set_seq2(file_key)
+        for index, csv_key in csv_df["match_key"].items():
+            if not csv_key:
+                continue
+            sequence_matcher.set_seq1(csv_key)
+            # Cheap upper bounds first; skip rows that cannot beat the current best.
+            if sequence_matcher.real_quick_ratio() <= best_ratio or sequence_matcher.quick_ratio() <= best_ratio:
+                continue
+            ratio = sequence_matcher.ratio()
             if ratio > best_ratio:
                 best_ratio = ratio
                 best_index = index
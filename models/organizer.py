@@ -8,17 +8,16 @@ import difflib
 
 from .matcher import FileMatcher
 from .extractor import EbookMetadataExtractor
+from .cascade import ClassificationCascade
+from .manifest import DecisionManifest
+from config import CANDIDATE_LABELS_WITH_DESCRIPTIONS, MANIFEST_FILENAME, CLASSIFY_CHUNK_SIZE
+from utility.normalize import add_match_keys, file_match_key
 
 
 class CSVData:
     def __init__(self, metadata_csv):
         self.metadata_csv = metadata_csv
-        self.df = pd.read_csv(self.metadata_csv)
-        if "match_key" not in self.df.columns:
-            self.df["match_key"] = self.df.apply(
-                lambda row: (str(row["title"]) + " " + str(row.get("authors", ""))).lower().strip(),
-                axis=1
-            )
+        self.df = add_match_keys(pd.read_csv(self.metadata_csv))
 
     def get_dataframe(self):
         return self.df
@@ -82,7 +81,7 @@ class FileOrganizer:
 class EbookOrganizer:
     def __init__(self, metadata_csv, source_folder, target_base_folder,
                  duplicates_folder, common_extensions, candidate_labels, classifier_engine,
-                 use_file_only=False, organize_by_author=False):
+                 use_file_only=False, organize_by_author=False, use_cascade=True, shard_plan=None):
         self.metadata_csv = metadata_csv
         self.source_folder = source_folder
         self.target_base_folder = target_base_folder
@@ -92,41 +91,68 @@ class EbookOrganizer:
         self.classifier_engine = classifier_engine
         self.use_file_only = use_file_only
         self.organize_by_author = organize_by_author
+        self.use_cascade = use_cascade
+        self.shard_plan = shard_plan
 
         self.csv_data = CSVData(metadata_csv)
         self.csv_df = self.csv_data.get_dataframe()
         self.file_matcher = FileMatcher(source_folder, common_extensions)
         self.file_organizer = FileOrganizer(target_base_folder, duplicates_folder)
         self.metadata_extractor = EbookMetadataExtractor(enable_title_cleaning=False)
+        self.manifest = DecisionManifest(os.path.join(target_base_folder, MANIFEST_FILENAME))
+        self.cascade = ClassificationCascade(candidate_labels, CANDIDATE_LABELS_WITH_DESCRIPTIONS, self.manifest)
+
+    def place(self, file_path, file_key, category, tier, score):
+        """
+        Moves the file into its category folder and records the decision.
+        In a sharded run the decision goes to the worker's move plan instead.
+        """
+        if self.shard_plan is not None:
+            self.shard_plan.record(file_path, file_key, category, tier, score)
+        else:
+            self.file_organizer.move_file(file_path, category)
+            self.manifest.record(file_path, file_key, category, tier, score)
+        self.file_matcher.remove_file(file_path)
+        self.cascade.record_tier(tier)
 
     def organize(self, progress_callback=None):
-        total = len(self.file_matcher.candidate_files)
+        self.organize_files(self.file_matcher.candidate_files[:], progress_callback)
+        summary = self.cascade.summary()
+        logging.info(summary)
+        return summary
+
+    def organize_files(self, file_paths, progress_callback=None):
+        """
+        Extracts, classifies and places the given files. Returns the number of files placed.
+        """
+        total = len(file_paths)
         processed = 0
-        for file_path in self.file_matcher.candidate_files[:]:
+        pending = []
+        for file_path in file_paths:
             file_ext = os.path.splitext(file_path)[1].lower()
             if file_ext not in ["." + ext.strip(".").lower() for ext in ["epub", "pdf", "mobi"]]:
                 continue
+            if self.shard_plan is not None and not self.shard_plan.claim(file_path):
+                continue
 
             title, author, _ = self.metadata_extractor.get_book_metadata(file_path)
             if not title:
                 title = os.path.splitext(os.path.basename(file_path))[0]
-            file_key = (title + " " + author).lower().strip()
-            if not file_key:
-                file_key = os.path.splitext(os.path.basename(file_path))[0].lower().strip()
+            file_key = file_match_key(os.path.basename(file_path), title, author)
 
             if self.organize_by_author:
                 folder_name = author if author else "Unknown Author"
-                self.file_organizer.move_file(file_path, folder_name)
-                self.file_matcher.remove_file(file_path)
+                self.place(file_path, file_key, folder_name, "author", 1.0)
                 processed += 1
                 if progress_callback:
                     progress_callback(processed, total)
                 continue
 
             if self.use_file_only:
+                matched_row = None
                 combined_prompt = file_key
-                new_predicted_category, new_score, _ = self.classifier_engine.classify_text(combined_prompt)
-                predicted_category = new_predicted_category if new_predicted_category and new_predicted_category != "Unknown" else "Unknown"
+                book_text = file_key
+                predicted_category = "Unknown"
             else:
                 best_index, ratio = self.file_matcher.find_best_csv_match(file_key, self.csv_df, threshold=0.6)
                 if best_index is None:
@@ -136,12 +162,54 @@ class EbookOrganizer:
                 predicted_category = matched_row["predicted_genre"] if "predicted_genre" in matched_row else "Unknown"
                 csv_prompt = matched_row["title"] + " " + str(matched_row.get("authors", ""))
                 combined_prompt = (csv_prompt + " " + file_key).strip()
-                new_predicted_category, new_score, _ = self.classifier_engine.classify_text(combined_prompt)
-                if new_predicted_category and new_predicted_category != "Unknown":
-                    predicted_category = new_predicted_category
+                book_text = csv_prompt
+
+            category, score, tier = (self.cascade.decide(book_text, file_key, matched_row)
+                                     if self.use_cascade else (None, 0.0, None))
+            if tier is None:
+                # Ambiguous books are classified together so the batcher can bucket them by length.
+                pending.append((file_path, file_key, combined_prompt, predicted_category))
+                if len(pending) >= CLASSIFY_CHUNK_SIZE:
+                    processed += self.classify_pending(pending)
+                    pending = []
+                    if progress_callback:
+                        progress_callback(processed, total)
+                continue
 
-            self.file_organizer.move_file(file_path, predicted_category)
-            self.file_matcher.remove_file(file_path)
+            self.place(file_path, file_key, category, tier, score)
             processed += 1
             if progress_callback:
                 progress_callback(processed, total)
+
+        if pending:
+            processed += self.classify_pending(pending)
+            if progress_callback:
+                progress_callback(processed, total)
+        return processed
+
+    def classify_pending(self, pending):
+        """
+        Runs the zero-shot classifier over (file_path, file_key, prompt, fallback_category)
+        entries and places each file. Returns the number of files placed.
+        """
+        prompts = [prompt for _, _, prompt, _ in pending]
+        results = self.classifier_engine.classify_texts(prompts)
+        if len(results) != len(pending):
+            # One bad prompt fails the whole batch; retry one by one so only that book is affected.
+            logging.warning(f"Batch classification of {len(pending)} books failed; retrying one at a time.")
+            results = []
+            for prompt in prompts:
+                single = self.classifier_engine.classify_texts([prompt])
+                results.append(single[0] if single else None)
+
+        placed = 0
+        for (file_path, file_key, _, predicted_category), result in zip(pending, results):
+            if result is None:
+                logging.error(f"Could not classify '{file_path}'. File not moved.")
+                continue
+            score = 0.0
+            if result["labels"][0] != "Unknown":
+                predicted_category, score = result["labels"][0], result["scores"][0]
+            self.place(file_path, file_key, predicted_category, "classifier", score)
+            placed += 1
+        return placed
@@ -0,0 +1,263 @@
+# models/server.py
+import os
+import json
+import time
+import queue
+import shutil
+import socket
+import struct
+import logging
+import threading
+import socketserver
+from collections import defaultdict
+from concurrent.futures import Future
+
+from config import (
+    INFERENCE_SERVER_BATCH_WAIT,
+    INFERENCE_SERVER_MAX_BATCH_TEXTS,
+    INFERENCE_SOCKET_GROUP,
+    INFERENCE_SOCKET_MODE,
+)
+
+HEADER = struct.Struct(">I")
+
+
+def send_message(stream, message):
+    payload = json.dumps(message).encode("utf-8")
+    stream.write(HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def recv_message(stream):
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+class InferenceClient:
+    """
+    Connection to a running InferenceServer. Requests from several threads are serialized
+    over one socket; the server batches them with requests from other processes.
+    """
+    def __init__(self, socket_path, timeout=600):
+        self.socket_path = socket_path
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.stream = self.sock.makefile("rwb")
+
+    @classmethod
+    def connect(cls, socket_path):
+        """
+        Returns a client if a server answers on socket_path, otherwise None.
+        """
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+            return None
+        try:
+            client = cls(socket_path)
+            client.request({"op": "ping"})
+            return client
+        except OSError as e:
+            # The socket exists, so a server is (or was) expected; loading a private copy of the
+            # models is worth a warning (e.g. PermissionError when not in the socket's group).
+            logging.warning(f"Cannot use inference server at '{socket_path}' ({e}); using in-process models.")
+            return None
+
+    def request(self, message):
+        with self.lock:
+            send_message(self.stream, message)
+            response = recv_message(self.stream)
+        if response is None:
+            raise ConnectionError("Inference server closed the connection.")
+        if "error" in response:
+            raise RuntimeError(f"Inference server error: {response['error']}")
+        return response.get("results")
+
+
+class RemotePipeline:
+    """
+    Stands in for a transformers pipeline ("classify" or "generate") by forwarding calls to
+    the inference server. If the server goes away, switches to a local pipeline built by
+    local_factory for the rest of the run.
+    """
+    def __init__(self, client, op, local_factory):
+        self.client = client
+        self.op = op
+        self.local_factory = local_factory
+        self.local = None
+
+    @property
+    def is_remote(self):
+        return self.local is None
+
+    @property
+    def tokenizer(self):
+        return self.local.tokenizer if self.local is not None else None
+
+    def __call__(self, inputs, **kwargs):
+        if self.local is None:
+            try:
+                return self.remote_call(inputs, **kwargs)
+            except (OSError, ConnectionError) as e:
+                logging.warning(f"Inference server unavailable ({e}); loading the model in-process.")
+                self.local = self.local_factory()
+        return self.local(inputs, **kwargs)
+
+    def remote_call(self, inputs, candidate_labels=None, **kwargs):
+        # The server picks its own batch sizes across clients.
+        kwargs.pop("batch_size", None)
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        message = {"op": self.op, "texts": texts}
+        if self.op == "classify":
+            if kwargs:
+                raise TypeError(f"Options not supported by the inference server: {sorted(kwargs)}")
+            labels = [candidate_labels] if isinstance(candidate_labels, str) else list(candidate_labels)
+            message["candidate_labels"] = labels
+            results = self.client.request(message)
+            return results[0] if single else results
+        # Generation options (e.g. max_length) are applied by the server's pipeline.
+        message["options"] = kwargs
+        # Same shapes as the local text2text pipeline: [dict] for a string, a flat list of dicts for a list.
+        return [{"generated_text": text} for text in self.client.request(message)]
+
+
+class PendingRequest:
+    def __init__(self, op, texts, candidate_labels, options=None):
+        self.op = op
+        self.texts = texts
+        self.candidate_labels = tuple(candidate_labels or ())
+        self.options = options or {}
+        self.future = Future()
+
+    def group_key(self):
+        # Only requests with the same labels and options can share an inference batch.
+        return self.op, self.candidate_labels, json.dumps(self.options, sort_keys=True)
+
+
+class InferenceServer:
+    """
+    Holds one copy of bart-large-mnli (and flan-t5, loaded on first use) and serves all
+    organizer processes on the machine over a Unix socket. Requests that arrive within
+    batch_wait seconds of each other are merged into one inference batch per label set
+    and generation options.
+    """
+    def __init__(self, socket_path, device=0, batch_wait=INFERENCE_SERVER_BATCH_WAIT,
+                 max_batch_texts=INFERENCE_SERVER_MAX_BATCH_TEXTS, socket_group=INFERENCE_SOCKET_GROUP,
+                 socket_mode=INFERENCE_SOCKET_MODE):
+        from .classifier import ClassifierEngine
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("The inference server needs Unix domain sockets, which this platform lacks.")
+        self.socket_path = socket_path
+        self.socket_group = socket_group
+        self.socket_mode = socket_mode
+        self.device = device
+        self.batch_wait = batch_wait
+        self.max_batch_texts = max_batch_texts
+        self.requests = queue.Queue()
+        self.engine = ClassifierEngine([], device=device, server_socket=None)
+        self.generator = None
+
+    def submit(self, op, texts, candidate_labels=None, options=None):
+        request = PendingRequest(op, texts, candidate_labels, options)
+        self.requests.put(request)
+        return request.future
+
+    def batch_loop(self):
+        while True:
+            batch = [self.requests.get()]
+            count = len(batch[0].texts)
+            deadline = time.monotonic() + self.batch_wait
+            while count < self.max_batch_texts:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                count += len(request.texts)
+
+            groups = defaultdict(list)
+            for request in batch:
+                groups[request.group_key()].append(request)
+            for (op, labels, _), requests in groups.items():
+                texts = [text for request in requests for text in request.texts]
+                try:
+                    results = self.run(op, texts, list(labels), requests[0].options)
+                    if len(results) != len(texts):
+                        raise RuntimeError(f"{op} returned {len(results)} results for {len(texts)} texts")
+                except Exception as e:
+                    logging.error(f"Error serving {op} batch of {len(texts)} texts: {e}")
+                    for request in requests:
+                        request.future.set_exception(e)
+                    continue
+                offset = 0
+                for request in requests:
+                    request.future.set_result(results[offset:offset + len(request.texts)])
+                    offset += len(request.texts)
+            logging.info(f"Served {count} texts from {len(batch)} requests.")
+
+    def run(self, op, texts, labels, options=None):
+        if op == "classify":
+            return self.engine.classify_texts(texts, candidate_labels=labels)
+        if op == "generate":
+            if self.generator is None:
+                from transformers import pipeline
+                self.generator = pipeline("text2text-generation", model="google/flan-t5-base", device=self.device)
+            results = self.generator(texts, batch_size=len(texts), **(options or {}))
+            return [result["generated_text"] if isinstance(result, dict) else result[0]["generated_text"]
+                    for result in results]
+        raise ValueError(f"Unknown operation '{op}'")
+
+    def serve_forever(self):
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    message = recv_message(self.rfile)
+                    if message is None:
+                        return
+                    if message.get("op") == "ping":
+                        send_message(self.wfile, {"results": "pong"})
+                        continue
+                    future = server.submit(message.get("op"), message.get("texts", []),
+                                           message.get("candidate_labels"), message.get("options"))
+                    try:
+                        send_message(self.wfile, {"results": future.result()})
+                    except Exception as e:
+                        send_message(self.wfile, {"error": str(e)})
+
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        if not os.path.exists(socket_dir):
+            os.makedirs(socket_dir)
+            # Clients must be able to reach the socket through its directory.
+            os.chmod(socket_dir, 0o2770 if self.socket_group else 0o755)
+            if self.socket_group:
+                shutil.chown(socket_dir, group=self.socket_group)
+
+        if os.path.exists(self.socket_path):
+            # A leftover socket from a crashed server; refuse to start if one is still answering.
+            if InferenceClient.connect(self.socket_path) is not None:
+                raise RuntimeError(f"An inference server is already running at '{self.socket_path}'.")
+            os.unlink(self.socket_path)
+
+        threading.Thread(target=self.batch_loop, daemon=True).start()
+        with socketserver.ThreadingUnixStreamServer(self.socket_path, RequestHandler) as unix_server:
+            unix_server.daemon_threads = True
+            # Connecting needs write permission on the socket, which the umask usually withholds.
+            if self.socket_group:
+                shutil.chown(self.socket_path, group=self.socket_group)
+            os.chmod(self.socket_path, self.socket_mode)
+            logging.info(f"Inference server listening on '{self.socket_path}' "
+                         f"(mode {self.socket_mode:o}, group {self.socket_group or 'default'}).")
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(self.socket_path)
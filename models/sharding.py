@@ -0,0 +1,126 @@
+# models/sharding.py
+import os
+import glob
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+
+from .manifest import DecisionManifest
+
+
+def shard_for(file_path, source_folder, shard_count):
+    """
+    Deterministic shard number for a file, stable across hosts: the hash is taken over
+    the path relative to the shared source folder, not the local mount point.
+    """
+    relative_path = os.path.relpath(file_path, source_folder).replace(os.sep, "/")
+    digest = hashlib.md5(relative_path.encode("utf-8")).hexdigest()
+    return int(digest, 16) % shard_count
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseTable:
+    """
+    SQLite lease table on the shared folder. A worker owns a file once it has inserted
+    its lease; leases of crashed workers expire and can be taken over.
+    """
+    def __init__(self, db_path, lease_seconds=3600):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "file_path TEXT PRIMARY KEY, worker_id TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, done INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def claim(self, file_key, worker_id):
+        now = time.time()
+        try:
+            cursor = self.connection.execute(
+                "INSERT INTO leases (file_path, worker_id, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(file_path) DO UPDATE SET worker_id = excluded.worker_id, "
+                "expires_at = excluded.expires_at WHERE leases.done = 0 AND leases.expires_at < ?",
+                (file_key, worker_id, now + self.lease_seconds, now)
+            )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logging.error(f"Error claiming lease for '{file_key}': {e}")
+            return False
+
+    def complete(self, file_key, worker_id):
+        try:
+            self.connection.execute(
+                "UPDATE leases SET done = 1 WHERE file_path = ? AND worker_id = ?",
+                (file_key, worker_id)
+            )
+        except sqlite3.Error as e:
+            logging.error(f"Error completing lease for '{file_key}': {e}")
+
+
+class ShardPlan:
+    """
+    One worker's share of a sharded run. Files are selected by path-hash shard and/or
+    claimed through a lease table; decisions are written to a per-worker move plan
+    instead of moving files, so only the merge step touches the library.
+    """
+    def __init__(self, plan_dir, source_folder, worker_id=None, shard_index=None, shard_count=None,
+                 lease_table=None):
+        self.plan_dir = plan_dir
+        self.source_folder = source_folder
+        self.worker_id = worker_id or default_worker_id()
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.lease_table = lease_table
+        if not os.path.exists(self.plan_dir):
+            os.makedirs(self.plan_dir)
+        self.plan = DecisionManifest(os.path.join(self.plan_dir, f"plan-{self.worker_id}.csv"))
+
+    def lease_key(self, file_path):
+        return os.path.relpath(file_path, self.source_folder).replace(os.sep, "/")
+
+    def claim(self, file_path):
+        if self.shard_count and shard_for(file_path, self.source_folder, self.shard_count) != self.shard_index:
+            return False
+        if self.lease_table is not None:
+            return self.lease_table.claim(self.lease_key(file_path), self.worker_id)
+        return True
+
+    def record(self, file_path, file_key, category, tier, score):
+        # Paths are stored relative to the source folder since hosts may mount the share differently.
+        relative_path = self.lease_key(file_path)
+        self.plan.record(relative_path, file_key, category, tier, score)
+        if self.lease_table is not None:
+            self.lease_table.complete(relative_path, self.worker_id)
+
+
+def merge_plans(plan_dir, organizer):
+    """
+    Applies every worker's move plan through the organizer (one move per file) and
+    returns the combined tier summary. Merged plans are renamed so a rerun skips them.
+    """
+    seen = set()
+    for plan_path in sorted(glob.glob(os.path.join(plan_dir, "plan-*.csv"))):
+        records = DecisionManifest(plan_path).load()
+        logging.info(f"Merging {len(records)} decisions from '{os.path.basename(plan_path)}'.")
+        for record in records:
+            file_path = os.path.normpath(os.path.join(organizer.source_folder, record["file_path"]))
+            if file_path in seen:
+                logging.warning(f"File '{file_path}' planned by more than one worker; keeping the first plan.")
+                continue
+            seen.add(file_path)
+            if not os.path.exists(file_path):
+                logging.warning(f"Planned file '{file_path}' no longer exists. Skipping.")
+                continue
+            organizer.place(file_path, record["file_key"], record["category"], record["tier"],
+                            float(record["score"] or 0.0))
+        os.replace(plan_path, plan_path + ".merged")
+
+    summary = organizer.cascade.summary()
+    logging.info(summary)
+    return summary
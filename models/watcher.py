@@ -0,0 +1,235 @@
+# models/watcher.py
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from config import (
+    WATCH_SETTLE_SECONDS,
+    WATCH_POLL_INTERVAL,
+    WATCH_BATCH_SIZE,
+    WATCH_BATCH_WAIT,
+)
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+class FolderWatcher:
+    """
+    Reports new or changed ebook files under source_folder once they have stopped
+    changing for settle_seconds. Uses inotify when available (Linux with inotify_simple
+    installed) and falls back to polling the folder tree. Folders in exclude_folders
+    (the organizer's target and duplicates folders, if they sit inside source_folder)
+    are neither watched nor scanned, so placed books are not picked up again.
+    """
+    def __init__(self, source_folder, common_extensions, settle_seconds=WATCH_SETTLE_SECONDS,
+                 poll_interval=WATCH_POLL_INTERVAL, use_inotify=True, exclude_folders=()):
+        self.source_folder = source_folder
+        self.common_extensions = common_extensions
+        self.exclude_folders = [os.path.realpath(folder) for folder in exclude_folders if folder]
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}
+        self.inotify = None
+        self.watch_dirs = {}
+        if use_inotify and INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.add_watches(self.source_folder)
+            except OSError as e:
+                logging.warning(f"inotify unavailable ({e}); falling back to polling.")
+                self.inotify = None
+        # Files already present are handled by the initial organize run, not by the watcher.
+        self.known = self.scan()
+
+    def is_candidate(self, path):
+        return os.path.splitext(path)[1].lower() in self.common_extensions and not self.is_excluded(path)
+
+    def is_excluded(self, path):
+        path = os.path.realpath(path)
+        return any(path == folder or path.startswith(folder + os.sep) for folder in self.exclude_folders)
+
+    def walk(self, folder):
+        for root, dirs, files in os.walk(folder):
+            if self.is_excluded(root):
+                dirs[:] = []
+                continue
+            dirs[:] = [d for d in dirs if not self.is_excluded(os.path.join(root, d))]
+            yield root, files
+
+    def signature(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_size, stat.st_mtime
+        except OSError:
+            return None
+
+    def scan(self, folder=None):
+        found = {}
+        for root, files in self.walk(folder or self.source_folder):
+            for f in files:
+                path = os.path.join(root, f)
+                if self.is_candidate(path):
+                    found[path] = self.signature(path)
+        return found
+
+    def add_watches(self, folder):
+        mask = flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO
+        for root, files in self.walk(folder):
+            self.watch_dirs[self.inotify.add_watch(root, mask)] = root
+
+    def collect_changes(self):
+        if self.inotify is None:
+            time.sleep(self.poll_interval)
+            current = self.scan()
+            for path, signature in current.items():
+                if self.known.get(path) != signature:
+                    self.pending.setdefault(path, (None, 0.0))
+            self.known = {path: self.known[path] for path in self.known if path in current}
+            return
+
+        for event in self.inotify.read(timeout=int(self.poll_interval * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                logging.warning("inotify queue overflowed; rescanning source folder.")
+                for path in self.scan():
+                    self.pending.setdefault(path, (None, 0.0))
+                continue
+            path = os.path.join(self.watch_dirs.get(event.wd, self.source_folder), event.name)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    # Files may land in a new folder before its watch exists.
+                    self.add_watches(path)
+                    for new_path in self.scan(path):
+                        self.pending.setdefault(new_path, (None, 0.0))
+            elif self.is_candidate(path):
+                self.pending.setdefault(path, (None, 0.0))
+
+    def poll(self):
+        """
+        Waits up to poll_interval for changes and returns the files that have settled.
+        """
+        self.collect_changes()
+        now = time.monotonic()
+        ready = []
+        for path, (last_signature, stable_since) in list(self.pending.items()):
+            current = self.signature(path)
+            if current is None:
+                del self.pending[path]
+            elif current != last_signature:
+                self.pending[path] = (current, now)
+            elif now - stable_since >= self.settle_seconds:
+                del self.pending[path]
+                self.known[path] = current
+                ready.append(path)
+        return ready
+
+
+class OrganizerDaemon:
+    """
+    Feeds settled files from a FolderWatcher to an already-loaded EbookOrganizer in
+    micro-batches, and optionally serves queue depth and throughput as JSON over HTTP.
+    """
+    def __init__(self, organizer, watcher, batch_size=WATCH_BATCH_SIZE, batch_wait=WATCH_BATCH_WAIT,
+                 status_address=None):
+        self.organizer = organizer
+        self.watcher = watcher
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.status_address = status_address
+        self.queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.processed = 0
+        self.recent = deque()
+        self.last_latency = 0.0
+        self.tier_counts = dict(organizer.cascade.tier_counts)
+
+    def run(self):
+        if self.status_address:
+            self.start_status_server()
+        worker = threading.Thread(target=self.process_batches, daemon=True)
+        worker.start()
+        logging.info(f"Watching '{self.watcher.source_folder}' "
+                     f"({'inotify' if self.watcher.inotify is not None else 'polling'}).")
+        try:
+            while not self.stop_event.is_set():
+                for path in self.watcher.poll():
+                    self.queue.put((path, time.monotonic()))
+        except KeyboardInterrupt:
+            logging.info("Stopping watch daemon.")
+        finally:
+            self.stop_event.set()
+            worker.join()
+
+    def process_batches(self):
+        while not self.stop_event.is_set() or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            placed = 0
+            try:
+                placed = self.organizer.organize_files([path for path, _ in batch])
+            except Exception as e:
+                logging.error(f"Error organizing batch of {len(batch)} files: {e}")
+            now = time.monotonic()
+            with self.lock:
+                self.processed += placed
+                self.last_latency = max(now - queued_at for _, queued_at in batch)
+                self.recent.extend([now] * placed)
+                self.prune_recent(now)
+                # The cascade's counter is only touched by this thread; the status thread reads the copy.
+                self.tier_counts = dict(self.organizer.cascade.tier_counts)
+
+    def prune_recent(self, now):
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+
+    def status(self):
+        with self.lock:
+            self.prune_recent(time.monotonic())
+            return {
+                "queue_depth": self.queue.qsize(),
+                "pending_settle": len(self.watcher.pending),
+                "processed": self.processed,
+                "files_per_minute": len(self.recent),
+                "last_batch_latency_seconds": round(self.last_latency, 3),
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "tiers": self.tier_counts,
+            }
+
+    def start_status_server(self):
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(daemon.status()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(self.status_address, StatusHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Status endpoint on http://{self.status_address[0]}:{self.status_address[1]}/")
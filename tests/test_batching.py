@@ -0,0 +1,62 @@
+# tests/test_batching.py
+import pytest
+
+from models.batching import AdaptiveBatcher, HYPOTHESIS_TOKENS
+
+
+class FakeInfer:
+    """Uppercases each text and raises a CUDA-style OOM for batches above oom_above."""
+    def __init__(self, oom_above=None):
+        self.oom_above = oom_above
+        self.calls = []
+
+    def __call__(self, batch):
+        self.calls.append(list(batch))
+        if self.oom_above is not None and len(batch) > self.oom_above:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return [text.upper() for text in batch]
+
+
+def texts_of_lengths(*lengths):
+    return ["x" * length + str(i) for i, length in enumerate(lengths)]
+
+
+def test_results_in_input_order_across_sorted_batches():
+    texts = texts_of_lengths(400, 4, 200, 40, 800, 0, 120)
+    infer = FakeInfer()
+    batcher = AdaptiveBatcher(initial_batch_size=2, max_batch_size=2)
+    assert batcher.run(texts, infer) == [text.upper() for text in texts]
+    # Batches were taken shortest first.
+    flattened = [len(text) for call in infer.calls for text in call]
+    assert flattened == sorted(flattened)
+
+
+def test_halves_on_oom_and_does_not_regrow_into_failing_size():
+    texts = texts_of_lengths(*[10] * 12)
+    infer = FakeInfer(oom_above=2)
+    batcher = AdaptiveBatcher(initial_batch_size=4, max_batch_size=16)
+    assert batcher.run(texts, infer) == [text.upper() for text in texts]
+    sizes = [len(call) for call in infer.calls]
+    # 4 fails, 2 works, growth probes 3 (below the failing size) once, then it stays at 2.
+    assert sizes == [4, 2, 3, 2, 2, 2, 2, 2]
+    assert batcher.batch_size == 2 and batcher.max_batch_size == 2
+
+    # The ceiling is kept between calls.
+    infer.calls.clear()
+    batcher.run(texts, infer)
+    assert all(len(call) <= 2 for call in infer.calls)
+
+
+def test_oom_at_batch_size_one_is_raised():
+    with pytest.raises(RuntimeError):
+        AdaptiveBatcher(initial_batch_size=1).run(["a"], FakeInfer(oom_above=0))
+
+
+def test_padded_token_budget_is_respected():
+    texts = texts_of_lengths(*[396] * 8)
+    per_text = 396 // 4 + 1 + HYPOTHESIS_TOKENS
+    infer = FakeInfer()
+    batcher = AdaptiveBatcher(initial_batch_size=8, max_batch_size=8, max_batch_tokens=3 * per_text)
+    batcher.run(texts, infer)
+    assert all(len(call) * per_text <= 3 * per_text for call in infer.calls)
+    assert sum(len(call) for call in infer.calls) == len(texts)
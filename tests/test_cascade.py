@@ -0,0 +1,57 @@
+# tests/test_cascade.py
+import pytest
+
+from config import CANDIDATE_LABELS_WITH_DESCRIPTIONS
+from models.cascade import ClassificationCascade, TokenLinearModel
+from utility.normalize import file_match_key
+
+
+@pytest.fixture
+def cascade():
+    return ClassificationCascade(list(CANDIDATE_LABELS_WITH_DESCRIPTIONS), CANDIDATE_LABELS_WITH_DESCRIPTIONS)
+
+
+def decide(cascade, title, author, csv_row=None):
+    book_text = f"{title} {author}"
+    return cascade.decide(book_text, file_match_key("book.epub", title, author), csv_row)
+
+
+def test_csv_genre_column_settles_book(cascade):
+    assert decide(cascade, "Mistborn", "Brandon Sanderson", {"tags": "Fantasy, Fiction"}) == ("Fantasy", 1.0, "csv")
+
+
+def test_ambiguous_csv_column_is_not_settled(cascade):
+    assert decide(cascade, "Unknown", "", {"tags": "Romance; Horror"}) == (None, 0.0, None)
+
+
+def test_label_phrase_settles_book(cascade):
+    label, _, tier = decide(cascade, "A Space Opera Anthology", "")
+    assert (label, tier) == ("Space Opera", "keyword")
+
+
+def test_several_keywords_settle_book(cascade):
+    label, _, tier = decide(cascade, "Fear: A Horror Collection", "")
+    assert (label, tier) == ("Horror", "keyword")
+
+
+@pytest.mark.parametrize("title, author", [
+    ("Life of Pi", "Yann Martel"),
+    ("The Well of Loneliness", "Radclyffe Hall"),
+    ("The Age of Innocence", "Edith Wharton"),
+    ("A Light in the Attic", "Shel Silverstein"),
+    ("Young Frankenstein", ""),
+])
+def test_single_common_word_goes_to_classifier(cascade, title, author):
+    assert decide(cascade, title, author) == (None, 0.0, None)
+
+
+def test_linear_model_learns_from_file_keys():
+    model = TokenLinearModel().fit(
+        ["dragon sword quest", "dragon wizard realm", "kiss wedding heart", "heart duke kiss"],
+        ["Fantasy", "Fantasy", "Romance", "Romance"],
+    )
+    label, probability = model.predict("the dragon and the wizard")
+    assert label == "Fantasy" and probability > 0.5
+    assert model.predict("unseen words only") == (None, 0.0)
+    # Only observed counts are stored, not a probability per label and vocabulary word.
+    assert "kiss" not in model.token_counts["Fantasy"]
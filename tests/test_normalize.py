@@ -0,0 +1,24 @@
+# tests/test_normalize.py
+import pytest
+
+from utility.normalize import normalize_text, normalize_series, file_match_key
+
+
+def test_series_matches_scalar_normalization():
+    pd = pytest.importorskip("pandas")
+    values = [
+        "Café Noir: L'Été!",
+        "  The   Hobbit -- J.R.R. Tolkien ",
+        float("nan"),
+        None,
+        "Война и мир Лев Толстой",
+        "吾輩は猫である 夏目漱石",
+        "Straße",
+    ]
+    expected = [normalize_text(value) if isinstance(value, str) else "" for value in values]
+    assert normalize_series(pd.Series(values, dtype=object)).tolist() == expected
+
+
+def test_non_latin_keys_are_kept():
+    assert file_match_key("Война и мир.epub", "Война и мир", "Лев Толстой") == "воина и мир лев толстои"
+    assert file_match_key("neko.epub", "吾輩は猫である", "")
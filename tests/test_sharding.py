@@ -0,0 +1,83 @@
+# tests/test_sharding.py
+import os
+
+from models.sharding import LeaseTable, ShardPlan, merge_plans, shard_for
+
+
+class FakeCascade:
+    def summary(self):
+        return "summary"
+
+
+class FakeOrganizer:
+    """Records placements and moves each file out of the source folder, like the real one."""
+    def __init__(self, source_folder, target_folder):
+        self.source_folder = source_folder
+        self.target_folder = target_folder
+        self.cascade = FakeCascade()
+        self.placed = []
+
+    def place(self, file_path, file_key, category, tier, score):
+        self.placed.append((file_path, category, tier))
+        os.replace(file_path, os.path.join(self.target_folder, os.path.basename(file_path)))
+
+
+def test_shards_are_stable_and_disjoint(tmp_path):
+    paths = [str(tmp_path / "books" / f"book-{i}.epub") for i in range(200)]
+    shards = [shard_for(path, str(tmp_path / "books"), 4) for path in paths]
+    assert shards == [shard_for(path, str(tmp_path / "books"), 4) for path in paths]
+    # Another host mounting the share elsewhere picks the same shards.
+    other = [str(tmp_path / "mnt" / f"book-{i}.epub") for i in range(200)]
+    assert shards == [shard_for(path, str(tmp_path / "mnt"), 4) for path in other]
+    assert set(shards) == {0, 1, 2, 3}
+
+    plans = [ShardPlan(str(tmp_path / "plans"), str(tmp_path / "books"), f"w{i}", i, 4) for i in range(4)]
+    for path in paths:
+        assert sum(plan.claim(path) for plan in plans) == 1
+
+
+def test_lease_is_exclusive_until_expired(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    leases = LeaseTable(db_path)
+    assert leases.claim("a.epub", "w1")
+    assert not LeaseTable(db_path).claim("a.epub", "w2")
+
+    expiring = LeaseTable(db_path, lease_seconds=-1)
+    assert expiring.claim("b.epub", "w1")
+    assert LeaseTable(db_path).claim("b.epub", "w2")
+
+
+def test_completed_lease_is_never_taken_over(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    leases = LeaseTable(db_path, lease_seconds=-1)
+    assert leases.claim("a.epub", "w1")
+    leases.complete("a.epub", "w1")
+    assert not LeaseTable(db_path, lease_seconds=-1).claim("a.epub", "w2")
+
+
+def test_merge_moves_each_file_once_and_renames_plans(tmp_path):
+    source, target, plan_dir = tmp_path / "books", tmp_path / "organized", tmp_path / "plans"
+    source.mkdir()
+    target.mkdir()
+    for name in ("a.epub", "b.epub"):
+        (source / name).write_text("book")
+
+    first = ShardPlan(str(plan_dir), str(source), "w1")
+    second = ShardPlan(str(plan_dir), str(source), "w2")
+    first.record(str(source / "a.epub"), "a", "Fantasy", "keyword", 0.9)
+    second.record(str(source / "a.epub"), "a", "Horror", "classifier", 0.7)
+    second.record(str(source / "b.epub"), "b", "Romance", "csv", 1.0)
+
+    organizer = FakeOrganizer(str(source), str(target))
+    assert merge_plans(str(plan_dir), organizer) == "summary"
+    assert organizer.placed == [
+        (str(source / "a.epub"), "Fantasy", "keyword"),
+        (str(source / "b.epub"), "Romance", "csv"),
+    ]
+    assert sorted(os.listdir(target)) == ["a.epub", "b.epub"]
+    assert sorted(os.listdir(plan_dir)) == ["plan-w1.csv.merged", "plan-w2.csv.merged"]
+
+    # A rerun finds nothing left to merge.
+    organizer.placed.clear()
+    merge_plans(str(plan_dir), organizer)
+    assert organizer.placed == []
@@ -0,0 +1,15 @@
+# tests/test_watcher.py
+from models.watcher import FolderWatcher
+
+
+def test_target_and_duplicates_folders_inside_source_are_skipped(tmp_path):
+    for folder in ("Organized/Fantasy", "Duplicates", "incoming"):
+        (tmp_path / folder).mkdir(parents=True)
+    watcher = FolderWatcher(str(tmp_path), [".epub"], settle_seconds=0, poll_interval=0, use_inotify=False,
+                            exclude_folders=[str(tmp_path / "Organized"), str(tmp_path / "Duplicates")])
+
+    for name in ("Organized/Fantasy/placed.epub", "Duplicates/copy.epub", "incoming/new.epub"):
+        (tmp_path / name).write_text("book")
+    watcher.poll()
+    assert watcher.poll() == [str(tmp_path / "incoming" / "new.epub")]
+    assert list(watcher.scan()) == [str(tmp_path / "incoming" / "new.epub")]
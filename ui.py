@@ -2,29 +2,14 @@ import os
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
 import logging
-import unicodedata
-import re
-from datasets import Dataset
 from models.organizer import EbookOrganizer
 from models.classifier import ClassifierEngine
 from utility.prompt import build_prompt
-from config import CANDIDATE_LABELS_WITH_DESCRIPTIONS
+from utility.normalize import file_match_key
+from config import CANDIDATE_LABELS_WITH_DESCRIPTIONS, CLASSIFY_CHUNK_SIZE
 
 
-def normalize_text(text):
-    """
-    Normalize text by removing diacritics, converting to lowercase, and stripping out non-alphanumeric characters (except spaces).
-    """
-    # Normalize unicode (e.g., é -> e)
-    text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-    # Convert to lowercase and strip extra spaces.
-    text = text.lower().strip()
-    # Remove unwanted punctuation (you can adjust the regex as needed)
-    text = re.sub(r'[^\w\s]', '', text)
-    return text
-
 class OrganizerApp:
     def __init__(self, root):
         self.root = root
@@ -177,20 +162,12 @@ class OrganizerApp:
                 organize_by_author=self.organize_by_author.get()
             )
 
-            # Load CSV data.
-            csv_df = pd.read_csv(self.metadata_csv.get())
-            if "match_key" not in csv_df.columns:
-                csv_df["match_key"] = csv_df.apply(
-                    lambda row: (str(row["title"]) + " " + str(row.get("authors", ""))).lower().strip(),
-                    axis=1
-                )
-            organizer.csv_df = csv_df
-
             total = len(organizer.file_matcher.candidate_files)
             processed = 0
-            batch_size = 16
+            batch_size = CLASSIFY_CHUNK_SIZE
             batch_prompts = []
             batch_file_paths = []
+            batch_file_keys = []
 
             for file_path in organizer.file_matcher.candidate_files[:]:
                 file_ext = os.path.splitext(file_path)[1].lower()
@@ -200,9 +177,7 @@ class OrganizerApp:
                 title, author, _ = organizer.metadata_extractor.get_book_metadata(file_path)
                 if not title:
                     title = os.path.splitext(os.path.basename(file_path))[0]
-                file_key = (title + " " + author).lower().strip()
-                if not file_key:
-                    file_key = os.path.splitext(os.path.basename(file_path))[0].lower().strip()
+                file_key = file_match_key(os.path.basename(file_path), title, author)
 
                 if self.organize_by_author.get():
                     folder_name = author if author else "Unknown Author"
@@ -213,6 +188,8 @@ class OrganizerApp:
                     continue
 
                 # Build prompt.
+                matched_row = None
+                cascade_text = file_key
                 if self.use_file_only.get():
                     prompt = file_key
                 else:
@@ -223,56 +200,61 @@ class OrganizerApp:
                     else:
                         matched_row = organizer.csv_df.iloc[best_index]
                         csv_prompt = matched_row["title"] + " " + str(matched_row.get("authors", ""))
+                        cascade_text = csv_prompt
                         prompt = build_prompt(csv_prompt, file_key, self.candidate_labels_with_descriptions)
 
+                # Tier 1: settle confident books without running the classifier.
+                if not self.use_custom_tag.get():
+                    category, score, tier = organizer.cascade.decide(cascade_text, file_key, matched_row)
+                    if tier is not None:
+                        organizer.place(file_path, file_key, category, tier, score)
+                        processed += 1
+                        self.root.after(0, self.update_progress, processed, total)
+                        continue
+
                 batch_prompts.append(prompt)
                 batch_file_paths.append(file_path)
+                batch_file_keys.append(file_key)
 
                 if len(batch_prompts) >= batch_size:
-                    self.classify_and_move(batch_prompts, batch_file_paths, organizer, custom_label, threshold_val)
-                    processed += len(batch_prompts)
+                    processed += self.classify_and_move(batch_prompts, batch_file_paths, batch_file_keys,
+                                                        organizer, custom_label, threshold_val)
                     self.root.after(0, self.update_progress, processed, total)
                     batch_prompts = []
                     batch_file_paths = []
+                    batch_file_keys = []
 
             if batch_prompts:
-                self.classify_and_move(batch_prompts, batch_file_paths, organizer, custom_label, threshold_val)
-                processed += len(batch_prompts)
+                processed += self.classify_and_move(batch_prompts, batch_file_paths, batch_file_keys,
+                                                    organizer, custom_label, threshold_val)
                 self.root.after(0, self.update_progress, processed, total)
 
+            summary = organizer.cascade.summary()
+            logging.info(summary)
             self.root.after(0, self.status_label.config, {"text": "Organizing complete!"})
-            messagebox.showinfo("Done", "Files have been organized.")
+            messagebox.showinfo("Done", f"Files have been organized.\n{summary}")
         except Exception as e:
             logging.error(f"Error during organization: {e}")
             self.root.after(0, self.status_label.config, {"text": "Error occurred."})
             messagebox.showerror("Error", f"An error occurred: {e}")
 
-    def classify_and_move(self, prompts, file_paths, organizer, candidate_labels, threshold_val):
+    def classify_and_move(self, prompts, file_paths, file_keys, organizer, candidate_labels, threshold_val):
+        """
+        Classifies a batch and moves the files. Returns the number of files handled; files
+        that could not be classified are left in place and not counted.
+        """
         if self.use_custom_tag.get():
-            # For custom mode, process each prompt individually if needed
-            for i, prompt in enumerate(prompts):
-                results = organizer.classifier_engine.classifier(
-                    prompt,
-                    candidate_labels=candidate_labels,
-                    multi_label=False
-                )
-                scores = results["scores"]
-                max_index = scores.index(max(scores))
-                max_score = scores[max_index]
-                selected_tag = candidate_labels[max_index]
+            # For custom mode, classify against the single desired category.
+            results = organizer.classifier_engine.classify_texts(prompts, candidate_labels=[candidate_labels])
+            for i, res in enumerate(results):
+                max_score = max(res["scores"])
                 if max_score >= threshold_val:
-                    predicted_category = selected_tag
                     logging.info(f"Custom tag confidence ({max_score:.2f}) meets threshold for file: {file_paths[i]}")
                     organizer.file_organizer.move_file_direct(file_paths[i])
                     organizer.file_matcher.remove_file(file_paths[i])
                 else:
                     logging.info(
                         f"Custom tag confidence ({max_score:.2f}) below threshold for file: {file_paths[i]}. File not moved.")
-        else:
-            # Use the datasets library to process prompts in batches
-            dataset = Dataset.from_dict({"text": prompts})
-            results = organizer.classifier_engine.classify_texts(dataset["text"], batch_size=16)
-            for i, res in enumerate(results):
-                predicted_category = res["labels"][0] if res["labels"][0] != "Unknown" else "Unknown"
-                organizer.file_organizer.move_file(file_paths[i], predicted_category)
-                organizer.file_matcher.remove_file(file_paths[i])
+            return len(results)
+        # Same path as EbookOrganizer: adaptive batching, one-by-one retry if the batch fails.
+        return organizer.classify_pending(list(zip(file_paths, file_keys, prompts, ["Unknown"] * len(prompts))))
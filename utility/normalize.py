@@ -0,0 +1,74 @@
+# utility/normalize.py
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+
+
+def _combining_pattern():
+    # Character class of every combining mark, so the scalar and vectorized paths drop
+    # exactly the same characters (pandas has no per-character predicate).
+    ranges = []
+    for code in range(sys.maxunicode + 1):
+        if unicodedata.combining(chr(code)):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+    return "[" + "".join(f"\\U{start:08x}-\\U{end:08x}" for start, end in ranges) + "]"
+
+
+COMBINING_PATTERN = _combining_pattern()
+PUNCTUATION_PATTERN = r'[^\w\s]'
+WHITESPACE_PATTERN = r'\s+'
+_combining = re.compile(COMBINING_PATTERN)
+_punctuation = re.compile(PUNCTUATION_PATTERN)
+_whitespace = re.compile(WHITESPACE_PATTERN)
+
+
+def normalize_text(text):
+    """
+    Normalize text by removing diacritics (non-Latin letters are kept), case-folding,
+    stripping out non-alphanumeric characters (except spaces) and collapsing whitespace.
+    """
+    text = _combining.sub('', unicodedata.normalize('NFKD', str(text).casefold()))
+    text = _punctuation.sub('', text)
+    return _whitespace.sub(' ', text).strip()
+
+
+def normalize_series(series):
+    """
+    Vectorized normalize_text for a whole pandas column. Missing values become "".
+    """
+    return (series.fillna("").astype(str)
+            .str.casefold()
+            .str.normalize('NFKD')
+            .str.replace(COMBINING_PATTERN, '', regex=True)
+            .str.replace(PUNCTUATION_PATTERN, '', regex=True)
+            .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+            .str.strip())
+
+
+def add_match_keys(df):
+    """
+    Ensure the CSV dataframe has a normalized "match_key" column. An existing column
+    is normalized as well, so CSV keys always have the same form as file keys.
+    """
+    if "match_key" in df.columns:
+        df["match_key"] = normalize_series(df["match_key"])
+    else:
+        authors = df["authors"].fillna("").astype(str) if "authors" in df.columns else ""
+        df["match_key"] = normalize_series(df["title"].fillna("").astype(str) + " " + authors)
+    return df
+
+
+@lru_cache(maxsize=65536)
+def file_match_key(filename, title, author):
+    """
+    Match key for a book file, cached per filename and metadata. Falls back to the
+    filename (without extension) when the metadata normalizes to nothing.
+    """
+    key = normalize_text(f"{title} {author}")
+    if not key:
+        key = normalize_text(filename.rsplit(".", 1)[0])
+    return key